@@ -1,8 +1,9 @@
 # -*- coding: utf-8 -*-
 from fastapi import APIRouter, Request, HTTPException
 from pydantic import BaseModel
+from typing import List, Optional
 
-from fastapi import UploadFile, File
+from fastapi import UploadFile, File, Form
 import os
 
 from app.core.job_store import job_store
@@ -19,6 +20,10 @@ class TextPayload(BaseModel):
     text: str
     lang: str = "tr"
 
+class DeadLetterRequeuePayload(BaseModel):
+    ids: Optional[List[str]] = None
+    all: bool = False  # tüm kuyruğu yeniden basmak için açıkça istenmeli
+
 # --- Uçlar ---
 @router.get("/status")
 def get_status(request: Request):
@@ -54,13 +59,43 @@ async def post_print_text(request: Request, payload: TextPayload):
 @router.post("/reprint")
 async def post_reprint(request: Request, jobid: str):
     mgr = request.app.state.manager
-    ok = await mgr.requeue(jobid)
-    if not ok:
+    new_jobid = await mgr.requeue(jobid)
+    if not new_jobid:
+        raise HTTPException(status_code=404, detail="job not found")
+    return {"status": "requeued", "jobid": new_jobid, "source_jobid": jobid}
+
+@router.get("/jobs/{jobid}")
+async def get_job(request: Request, jobid: str):
+    mgr = request.app.state.manager
+    status = await mgr.job_status(jobid)
+    if not status:
+        raise HTTPException(status_code=404, detail="job not found")
+    return status
+
+@router.get("/jobs/{jobid}/wait")
+async def get_job_wait(request: Request, jobid: str, timeout: float = 30.0):
+    # long-poll: job bitince (done/failed) ya da timeout dolunca döner
+    mgr = request.app.state.manager
+    status = await mgr.wait_job(jobid, timeout=min(max(timeout, 0.0), 60.0))
+    if not status:
         raise HTTPException(status_code=404, detail="job not found")
-    return {"status": "requeued", "jobid": jobid}
+    return status
+
+@router.get("/dead-letters")
+def get_dead_letters(request: Request, limit: int = 100):
+    mgr = request.app.state.manager
+    return mgr.dead_letters(limit=limit)
+
+@router.post("/dead-letters/requeue")
+async def post_dead_letters_requeue(request: Request, payload: DeadLetterRequeuePayload):
+    if payload.all == bool(payload.ids):
+        raise HTTPException(status_code=400, detail="give either ids or all=true")
+    mgr = request.app.state.manager
+    mapping = await mgr.requeue_dead_letters(None if payload.all else payload.ids)
+    return {"status": "requeued", "count": len(mapping), "jobs": mapping}
 
 @router.post("/print/image")
-async def post_print_image(request: Request, file: UploadFile = File(...)):
+async def post_print_image(request: Request, file: UploadFile = File(...), banded: bool = Form(False)):
     # yükleme klasörü
     os.makedirs("data/uploads", exist_ok=True)
     dest_path = os.path.join("data", "uploads", file.filename)
@@ -70,7 +105,7 @@ async def post_print_image(request: Request, file: UploadFile = File(...)):
     # kuyruğa at
     mgr = request.app.state.manager
     try:
-        jobid = await mgr.enqueue_print_image(dest_path)
+        jobid = await mgr.enqueue_print_image(dest_path, banded=banded)
     except RuntimeError as e:
         raise HTTPException(status_code=503, detail=str(e))
     # 🔽 yeni: UI log/reprint için kayıt
@@ -78,6 +113,7 @@ async def post_print_image(request: Request, file: UploadFile = File(...)):
         "filename": file.filename,
         "path": dest_path,
         "cut": False,        # gerekiyorsa gönder
+        "banded": banded,
     }, meta={"queue_jobid": jobid})
     return {"status": "queued", "jobid": jobid, "file": file.filename}
 
@@ -87,32 +123,17 @@ import io
 from typing import List
 
 @router.get("/logs")
-def get_logs(limit: int = 200, format: str = "json"):
-    log_path = "app/logs/logs.json"
-    if not os.path.exists(log_path):
-        return [] if format == "json" else StreamingResponse(io.StringIO(""), media_type="text/csv")
-
-    with open(log_path, "r", encoding="utf-8") as f:
-        lines = f.read().splitlines()
-
-    # Loguru 'serialize=True' olduğu için her satır bir JSON objesi
-    lines = lines[-limit:] if limit > 0 else lines
-    records: List[dict] = []
-    for line in lines:
-        try:
-            records.append(json.loads(line))
-        except Exception:
-            continue
+def get_logs(request: Request, limit: int = 200, format: str = "json"):
+    # Yazdırma olay günlüğü: dosyanın sonundan geriye doğru yalnızca `limit` satır okunur
+    journal = request.app.state.journal
+    records: List[dict] = journal.tail(limit)
 
     if format.lower() == "csv":
         # CSV üret
         if not records:
             return StreamingResponse(io.StringIO(""), media_type="text/csv")
-        # başlıklar: unique key set
-        keys = set()
-        for r in records:
-            keys.update(r.keys())
-        keys = list(keys)
+        # başlıklar: sabit olay şeması
+        keys = ["ts", "op", "device", "jobid", "status", "err", "dur"]
 
         buf = io.StringIO()
         # header
@@ -6,6 +6,8 @@ from typing import Optional
 from escpos.printer import Network  # python-escpos
 from PIL import Image
 
+from app.utils.image_tools import iter_raster_bands
+
 class LanPrinter:
     """
     Basit LAN yazıcı sargısı (9100/TCP). python-escpos.Network kullanır.
@@ -55,10 +57,22 @@ class LanPrinter:
                 pass
         await loop.run_in_executor(None, _do)
 
-    async def print_image(self, image_path: str) -> None:
+    async def print_image(self, image_path: str, banded: bool = False, band_height: int = 256) -> None:
         if not (self._printer and self.connected):
             raise RuntimeError("NOT_CONNECTED")
         loop = asyncio.get_running_loop()
+        if banded:
+            def _do_banded():
+                # Şerit şerit raster + yaz: bellek şerit boyutunda, TCP yazımı
+                # bloklandığında (yazıcı tamponu dolu) üretim de bekler
+                for band in iter_raster_bands(image_path, band_height, self._media_width()):
+                    self._printer._raw(band)
+                try:
+                    self._printer.cut()
+                except Exception:
+                    pass
+            await loop.run_in_executor(None, _do_banded)
+            return
         def _do():
             img = Image.open(image_path)
             # python-escpos kendi içinde yeniden ölçekler/monokroma çevirir
@@ -68,3 +82,10 @@ class LanPrinter:
             except Exception:
                 pass
         await loop.run_in_executor(None, _do)
+
+    def _media_width(self) -> Optional[int]:
+        # şeritli yolda ölçekleme bizde: profil genişliği bilinmiyorsa olduğu gibi bas
+        try:
+            return int(self._printer.profile.profile_data["media"]["width"]["pixels"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            return None
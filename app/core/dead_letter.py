@@ -0,0 +1,72 @@
+# app/core/dead_letter.py
+from __future__ import annotations
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable
+import json, time
+
+from app.core.job_store import DATA_DIR
+
+DEAD_LETTER_FILE = DATA_DIR / "dead_letter.jsonl"
+
+class DeadLetterStore:
+    """
+    Yeniden deneme limitini aşan job'lar için kalıcı JSONL store.
+    Her satır: {"id": str, "kind": "text"|"image", "payload": {...}, "attempts": int, "error": str, "ts": float}
+    """
+    def __init__(self, path: Path = DEAD_LETTER_FILE):
+        self.path = path
+        self.path.touch(exist_ok=True)
+
+    def add(self, job_id: str, kind: str, payload: Dict, attempts: int, error: str) -> None:
+        rec = {
+            "id": job_id,
+            "kind": kind,
+            "payload": payload,
+            "attempts": attempts,
+            "error": error,
+            "ts": time.time(),
+        }
+        with self.path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+
+    def list(self, limit: int = 100) -> List[Dict]:
+        rows = self._read_all()
+        rows.sort(key=lambda r: r.get("ts", 0), reverse=True)
+        return rows[:limit] if limit > 0 else rows
+
+    def pop(self, job_ids: Optional[Iterable[str]] = None) -> List[Dict]:
+        """
+        Verilen id'leri (None ise hepsini) kuyruktan çıkarır ve döndürür.
+        Kalan kayıtlar dosyaya atomik olarak yeniden yazılır.
+        """
+        rows = self._read_all()
+        wanted = None if job_ids is None else set(job_ids)
+        taken: List[Dict] = []
+        kept: List[Dict] = []
+        for r in rows:
+            if wanted is None or r.get("id") in wanted:
+                taken.append(r)
+            else:
+                kept.append(r)
+        if taken:
+            tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+            with tmp.open("w", encoding="utf-8") as f:
+                for r in kept:
+                    f.write(json.dumps(r, ensure_ascii=False) + "\n")
+            tmp.replace(self.path)
+        return taken
+
+    def _read_all(self) -> List[Dict]:
+        rows: List[Dict] = []
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    rows.append(json.loads(line))
+                except Exception:
+                    continue
+        return rows
+
+dead_letter_store = DeadLetterStore()
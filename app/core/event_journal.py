@@ -0,0 +1,164 @@
+# app/core/event_journal.py
+from __future__ import annotations
+import gzip
+import json
+import os
+import queue
+import shutil
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+from loguru import logger
+
+BASE_DIR = Path(__file__).resolve().parents[2]
+LOG_DIR = BASE_DIR / "app" / "logs"
+EVENTS_FILE = LOG_DIR / "events.jsonl"
+
+_STOP = object()
+
+class EventJournal:
+    """
+    Yazdırma olayları için kompakt JSONL günlüğü.
+    Her satır: {"ts": float, "op": str, "device": str, "status": str, "jobid"?: str, "err"?: str, "dur"?: {"<ad>_ms": float}}
+    err kısa, sabit bir hata kodudur (ör. "FILE_NOT_FOUND"); mesaj ve traceback app.log'dadır.
+    record() yalnızca kuyruğa atar; dosyaya yazım, rotasyon ve sıkıştırma arka plan thread'indedir.
+      - max_bytes: dosya bu boyuta ulaşınca döndürülür (0 -> rotasyon yok)
+      - backups:   tutulacak eski dosya sayısı (events.jsonl.1[.gz] en yenisi)
+      - compress:  eski dosyalar gzip'lensin mi
+    """
+    def __init__(
+        self,
+        path: Path = EVENTS_FILE,
+        max_bytes: int = 5 * 1024 * 1024,
+        backups: int = 5,
+        compress: bool = True,
+        queue_size: int = 10000,
+    ) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.path.touch(exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self.backups = max(0, int(backups))
+        self.compress = bool(compress)
+        self.dropped = 0  # kuyruk doluyken kaybedilen olay sayısı
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=queue_size)
+        self._thread: Optional[threading.Thread] = None
+        self._file_lock = threading.Lock()  # rotasyon sırasında tail() okumasın
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._thread = threading.Thread(target=self._run, name="event_journal", daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0):
+        if not (self._thread and self._thread.is_alive()):
+            return
+        self._queue.put(_STOP)
+        self._thread.join(timeout)
+
+    # ---------- public API ----------
+    def record(
+        self,
+        op: str,
+        device: str,
+        status: str = "ok",
+        jobid: Optional[str] = None,
+        err: Optional[str] = None,
+        **durations: float,
+    ) -> None:
+        rec: Dict[str, Any] = {"ts": round(time.time(), 3), "op": op, "device": device, "status": status}
+        if jobid:
+            rec["jobid"] = jobid
+        if err:
+            rec["err"] = err
+        if durations:
+            rec["dur"] = {k: round(v, 1) for k, v in durations.items()}
+        try:
+            self._queue.put_nowait(rec)
+        except queue.Full:
+            self.dropped += 1
+
+    def tail(self, limit: int = 200) -> List[Dict[str, Any]]:
+        """Son `limit` kaydı (eskiden yeniye) dosyanın sonundan geriye okuyarak döndürür."""
+        with self._file_lock:
+            lines = self._tail_lines(limit)
+        rows: List[Dict[str, Any]] = []
+        for line in lines:
+            try:
+                rows.append(json.loads(line))
+            except Exception:
+                continue
+        return rows
+
+    # ---------- iç işler ----------
+    def _tail_lines(self, limit: int) -> List[str]:
+        with self.path.open("rb") as f:
+            if limit <= 0:
+                return f.read().decode("utf-8", "replace").splitlines()
+            f.seek(0, os.SEEK_END)
+            pos = f.tell()
+            buf = b""
+            block = 64 * 1024
+            while pos > 0 and buf.count(b"\n") <= limit:
+                step = min(block, pos)
+                pos -= step
+                f.seek(pos)
+                buf = f.read(step) + buf
+        return buf.decode("utf-8", "replace").splitlines()[-limit:]
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            batch = [item]
+            # birikmiş olayları tek yazımda topla
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            stop = any(r is _STOP for r in batch)
+            lines = "".join(json.dumps(r, ensure_ascii=False, separators=(",", ":")) + "\n" for r in batch if r is not _STOP)
+            try:
+                if lines:
+                    self._write(lines)
+            except Exception:
+                logger.exception("event journal write failed")
+            if stop:
+                return
+
+    def _write(self, lines: str):
+        data = lines.encode("utf-8")
+        with self._file_lock:
+            # yazmadan önce döndür: güncel dosya hiçbir zaman boş kalmaz
+            size = self.path.stat().st_size if self.path.exists() else 0
+            if self.max_bytes > 0 and size > 0 and size + len(data) > self.max_bytes:
+                self._rotate()
+            with self.path.open("ab") as f:
+                f.write(data)
+
+    def _backup_path(self, i: int) -> Path:
+        suffix = f".{i}.gz" if self.compress else f".{i}"
+        return self.path.with_name(self.path.name + suffix)
+
+    def _rotate(self):
+        if self.backups == 0:
+            self.path.write_bytes(b"")
+            return
+        oldest = self._backup_path(self.backups)
+        if oldest.exists():
+            oldest.unlink()
+        for i in range(self.backups - 1, 0, -1):
+            src = self._backup_path(i)
+            if src.exists():
+                src.replace(self._backup_path(i + 1))
+        first = self._backup_path(1)
+        if self.compress:
+            with self.path.open("rb") as src_f, gzip.open(first, "wb") as dst_f:
+                shutil.copyfileobj(src_f, dst_f)
+            self.path.write_bytes(b"")
+        else:
+            self.path.replace(first)
+            self.path.touch()
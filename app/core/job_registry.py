@@ -0,0 +1,58 @@
+# app/core/job_registry.py
+from __future__ import annotations
+from collections import OrderedDict
+from typing import Generic, Iterator, Optional, Tuple, TypeVar
+import time
+
+T = TypeVar("T")
+
+class JobRegistry(Generic[T]):
+    """
+    Sınırlı bellek içi job kaydı.
+      - max_size: en fazla bu kadar job tutulur, taşarsa en az kullanılan (LRU) atılır
+      - ttl:      saniye; eklenmesinin üzerinden ttl geçen job atılır (0 -> süresiz)
+    Atılan eski job'lar için kalıcı kaynak JobStore'dur.
+    """
+    def __init__(self, max_size: int = 1000, ttl: float = 3600.0) -> None:
+        self.max_size = max(1, int(max_size))
+        self.ttl = float(ttl)
+        self._items: "OrderedDict[str, Tuple[float, T]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+    def __setitem__(self, job_id: str, job: T) -> None:
+        self.add(job_id, job)
+
+    def add(self, job_id: str, job: T) -> None:
+        self._items[job_id] = (time.monotonic(), job)
+        self._items.move_to_end(job_id)
+        self._evict()
+
+    def get(self, job_id: str) -> Optional[T]:
+        item = self._items.get(job_id)
+        if item is None:
+            return None
+        added, job = item
+        if self._expired(added, time.monotonic()):
+            del self._items[job_id]
+            return None
+        self._items.move_to_end(job_id)
+        return job
+
+    def values(self) -> Iterator[T]:
+        self._evict()
+        return iter([job for _, job in self._items.values()])
+
+    def _expired(self, added: float, now: float) -> bool:
+        return self.ttl > 0 and now - added > self.ttl
+
+    def _evict(self) -> None:
+        # TTL: ekleme sırası korunmadığı için (LRU move_to_end) tümü taranır
+        if self.ttl > 0:
+            now = time.monotonic()
+            stale = [jid for jid, (added, _) in self._items.items() if self._expired(added, now)]
+            for jid in stale:
+                del self._items[jid]
+        while len(self._items) > self.max_size:
+            self._items.popitem(last=False)
@@ -2,13 +2,14 @@
 from __future__ import annotations
 from pathlib import Path
 from typing import Dict, List, Optional
-import json, uuid, time
+import json, threading, uuid, time
 
 # Proje kökü: .../app/core/job_store.py -> parents[2] = proje kökü
 BASE_DIR = Path(__file__).resolve().parents[2]
 DATA_DIR = BASE_DIR / "data"
 DATA_DIR.mkdir(parents=True, exist_ok=True)
 JOBS_FILE = DATA_DIR / "print_jobs.jsonl"
+JOB_STATES_FILE = DATA_DIR / "job_states.jsonl"
 
 class JobStore:
     def __init__(self, path: Path = JOBS_FILE):
@@ -47,4 +48,84 @@ class JobStore:
                     pass
         return None
 
+    def find(self, job_id: str) -> Optional[Dict]:
+        # tek geçiş: kaydın kendi id'si ya da (aynı kuyruk id'si için en son) queue_jobid
+        by_queue: Optional[Dict] = None
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if job_id not in line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                if rec.get("id") == job_id:
+                    return rec
+                if (rec.get("meta") or {}).get("queue_jobid") == job_id:
+                    by_queue = rec
+        return by_queue
+
+class JobStateStore:
+    """
+    Kuyruk job'larının son durumu (JSONL).
+    Her satır: PrintJob.status() + {"ts": float} (+ ilk satırda "payload"); aynı jobid'nin
+    satırları birleştirilir, sonraki alanlar öncekileri ezer.
+    Dosya max_bytes'ı aşınca her job tek satıra indirilir ve dosya max_bytes/2'nin altına
+    inene kadar en eski job'lar atılır. Çağrılar bloklayıcıdır; event loop dışında çalıştırın.
+    """
+    def __init__(self, path: Path = JOB_STATES_FILE, max_bytes: int = 4 * 1024 * 1024):
+        self.path = path
+        self.path.touch(exist_ok=True)
+        self.max_bytes = int(max_bytes)
+        self._lock = threading.Lock()
+
+    def save(self, status: Dict, payload: Optional[Dict] = None) -> None:
+        rec = dict(status, ts=time.time())
+        if payload is not None:
+            rec["payload"] = payload
+        with self._lock:
+            with self.path.open("a", encoding="utf-8") as f:
+                f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+            if self.max_bytes > 0 and self.path.stat().st_size > self.max_bytes:
+                self._compact()
+
+    def get(self, job_id: str) -> Optional[Dict]:
+        found: Optional[Dict] = None
+        with self._lock, self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                if job_id not in line:
+                    continue
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                if rec.get("jobid") == job_id:
+                    found = dict(found or {}, **rec)
+        return found
+
+    def _compact(self) -> None:
+        latest: Dict[str, Dict] = {}
+        with self.path.open("r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    rec = json.loads(line)
+                except Exception:
+                    continue
+                jid = rec.get("jobid")
+                if jid:
+                    latest[jid] = dict(latest.get(jid) or {}, **rec)
+        kept: List[str] = []
+        size = 0
+        for rec in sorted(latest.values(), key=lambda r: r.get("ts", 0), reverse=True):
+            line = json.dumps(rec, ensure_ascii=False) + "\n"
+            size += len(line.encode("utf-8"))
+            if size > self.max_bytes // 2:
+                break
+            kept.append(line)
+        tmp = self.path.with_suffix(self.path.suffix + ".tmp")
+        with tmp.open("w", encoding="utf-8") as f:
+            f.writelines(reversed(kept))
+        tmp.replace(self.path)
+
 job_store = JobStore()
+job_state_store = JobStateStore()
@@ -1,23 +1,102 @@
 # app/core/printer_manager.py
 from __future__ import annotations
 import asyncio
-from pathlib import Path
-from typing import Optional, Dict, Any
-from dataclasses import dataclass
+import heapq
+import itertools
+import contextlib
+import re
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Optional, Dict, Any, List, Iterable, Tuple
+from dataclasses import dataclass, field
 from loguru import logger
 
-# Pillow görüntü desteği
-from PIL import Image
+# Yeniden deneme gecikmesi (exponential backoff + jitter)
+from tenacity import RetryCallState, wait_exponential_jitter
 
 # ESC/POS
 from escpos import printer as escpos_printer
 
+from PIL import UnidentifiedImageError
+
+from app.core.event_journal import EventJournal
+from app.core.dead_letter import DeadLetterStore, dead_letter_store
+from app.core.job_registry import JobRegistry
+from app.core.job_store import JobStore, JobStateStore, job_store, job_state_store
+from app.utils.image_tools import rasterize_image, image_size, open_band_reader, render_band
+
 # ------- Job modeli -------
+# Durumlar: queued -> rendering (yalnızca görsel) -> printing -> done
+#           hata: -> queued (retry bekliyor) ... -> failed (dead-letter)
+class ImageDecodeError(Exception):
+    """Şeritli okuma/çözme hatası (kesik ya da bozuk dosya)."""
+
+class PartialPrintError(RuntimeError):
+    """Şeritli baskı yarıda kaldı; cihaza en az bir şerit gitti."""
+
+# Tekrar denemekle düzelmeyecek hatalar: doğrudan dead-letter.
+# PartialPrintError: yeniden denemek aynı kısmi çıktıyı tekrar basardı.
+NON_RETRYABLE_ERRORS = (
+    FileNotFoundError, IsADirectoryError, UnidentifiedImageError, KeyError, TypeError,
+    ImageDecodeError, PartialPrintError,
+)
+
+def _error_code(err: BaseException) -> str:
+    """Journal için kısa hata kodu: bilinen türler sabit kod, "PRINTER_NOT_CONNECTED" gibi
+    mesajlar olduğu gibi, diğerleri tür adından (USBError -> USB_ERROR)."""
+    if isinstance(err, (FileNotFoundError, IsADirectoryError)):
+        return "FILE_NOT_FOUND"
+    if isinstance(err, (UnidentifiedImageError, ImageDecodeError)):
+        return "BAD_IMAGE"
+    if isinstance(err, PartialPrintError):
+        return "PARTIAL_PRINT"
+    if isinstance(err, (KeyError, TypeError)):
+        return "BAD_PAYLOAD"
+    if isinstance(err, BrokenProcessPool):
+        return "PREP_POOL_BROKEN"
+    if isinstance(err, (TimeoutError, asyncio.TimeoutError)):
+        return "TIMEOUT"
+    msg = str(err)
+    if re.fullmatch(r"[A-Z][A-Z0-9_]{2,63}", msg):
+        return msg
+    name = re.sub(r"(?<=[a-z0-9])(?=[A-Z])|(?<=[A-Z])(?=[A-Z][a-z])", "_", type(err).__name__)
+    return name.upper()
+
+JOB_STATES = ("queued", "rendering", "printing", "done", "failed")
+FINAL_STATES = ("done", "failed")
+
 @dataclass
 class PrintJob:
     id: str
     kind: str  # "text" | "image"
     payload: Dict[str, Any]
+    attempts: int = 0               # başarısız deneme sayısı
+    last_error: Optional[str] = None
+    state: str = "queued"
+    timestamps: Dict[str, float] = field(default_factory=dict)  # durum -> son giriş anı (epoch)
+    finished: asyncio.Event = field(default_factory=asyncio.Event, repr=False, compare=False)
+
+    def mark(self, state: str):
+        self.state = state
+        self.timestamps[state] = time.time()
+        if state in FINAL_STATES:
+            self.finished.set()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "jobid": self.id,
+            "kind": self.kind,
+            "state": self.state,
+            "attempts": self.attempts,
+            "last_error": self.last_error,
+            "timestamps": dict(self.timestamps),
+        }
+
+@dataclass
+class _Prepared:
+    # prep çıktısı: raster future'ı ve onu çalıştıran pool (bozulursa hangisi olduğu bilinsin)
+    pool: ProcessPoolExecutor
+    result: asyncio.Future
 
 import uuid, time
 
@@ -28,16 +107,66 @@ class PrinterManager:
       - usb:   python-escpos ile USB
       - lan:   (opsiyonel) IP:9100 raw soket (sonra ekleyebiliriz)
     Kuyruk:
-      - enqueue_* -> asyncio.Queue -> worker tek kanal üzerinden cihaza yazar
+      - enqueue_* -> asyncio.Queue -> hazırlık (prep) -> hazır kuyruğu -> worker tek kanal üzerinden cihaza yazar
+      - prep: görselleri process pool'da decode + raster eder; cihaz job N'i basarken
+        N+1..N+lookahead hazırlanır, worker yalnızca hazır byte'ları yazar
+      - banded: çok uzun görseller (veya banded=True) artımlı okunup şerit şerit
+        process pool'da raster edilir ve akıtılır; bellek şerit boyutundadır,
+        ilk şerit hazır olmadan cihaz kilidi alınmaz
+      - hata alan job -> gecikme kuyruğu (heap) -> süresi gelince ana kuyruğa döner
+      - max_retries aşılırsa -> kalıcı dead-letter kuyruğu (data/dead_letter.jsonl)
+    Job kaydı:
+      - bitmemiş job'lar _pending'de tutulur, asla atılmaz
+      - biten job'ların kaydı sınırlıdır (LRU + TTL); atılan id'lerin durumu JobStateStore'dan,
+        reprint payload'ı JobStore'dan okunur
     """
-    def __init__(self) -> None:
+    def __init__(
+        self,
+        max_retries: int = 5,
+        retry_initial: float = 1.0,
+        retry_max: float = 60.0,
+        dead_letters: DeadLetterStore = dead_letter_store,
+        max_jobs: int = 1000,
+        job_ttl: float = 3600.0,
+        store: JobStore = job_store,
+        states: JobStateStore = job_state_store,
+        prep_workers: Optional[int] = None,
+        prep_lookahead: int = 2,
+        print_width: Optional[int] = None,
+        band_height: int = 256,
+        band_threshold: int = 4096,
+        journal: Optional[EventJournal] = None,
+    ) -> None:
         self._mode: str = "dummy"
         self._connected: bool = True   # dummy modda True say
         self._device: Optional[Any] = None  # Usb() örneği
         self._queue: asyncio.Queue[PrintJob] = asyncio.Queue()
-        self._jobs: Dict[str, PrintJob] = {}
+        self._jobs: JobRegistry[PrintJob] = JobRegistry(max_size=max_jobs, ttl=job_ttl)
+        self._pending: Dict[str, PrintJob] = {}  # kuyruk/hazır/retry/işlemde; done/failed olunca çıkar
+        self._store = store
+        self._states = states  # durum geçmişi: kuyruğa alınınca ve bitince yazılır
+        # durum dosyası I/O'su event loop dışında, tek thread'de sıralı (okuma önceki yazımları görür)
+        self._state_io = ThreadPoolExecutor(max_workers=1, thread_name_prefix="job_state")
         self._worker_task: Optional[asyncio.Task] = None
+        # prep hattı: (job, raster future | None, şeritli mi); maxsize = önden hazırlanacak job sayısı
+        self._ready: asyncio.Queue[Tuple[PrintJob, Optional[_Prepared], bool]] = asyncio.Queue(maxsize=max(1, int(prep_lookahead)))
+        self._prep_task: Optional[asyncio.Task] = None
+        self._prep_workers = prep_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+        self._print_width = print_width  # None -> bağlı yazıcı profilinin media.width.pixels değeri
+        self._head_width: Optional[int] = None
+        self._band_height = int(band_height)
+        self._band_threshold = int(band_threshold)  # bu yükseklikten (px) uzun görseller şeritli basılır
         self._lock = asyncio.Lock()  # cihaz erişimini serialize et
+        # retry: (due_monotonic, seq, job) heap'i; worker'ı bekletmeden zamanlanır
+        self._max_retries = int(max_retries)
+        self._retry_wait = wait_exponential_jitter(initial=retry_initial, max=retry_max)
+        self._retry_heap: List[Tuple[float, int, PrintJob]] = []
+        self._retry_seq = itertools.count()
+        self._retry_wakeup = asyncio.Event()
+        self._retry_task: Optional[asyncio.Task] = None
+        self._dead_letters = dead_letters
+        self._journal = journal  # yazdırma olay günlüğü (opsiyonel)
         self._start_worker()
 
     # ---------- lifecycle ----------
@@ -45,15 +174,24 @@ class PrinterManager:
         if self._worker_task and not self._worker_task.done():
             return
         self._worker_task = asyncio.create_task(self._worker_loop(), name="printer_worker")
+        self._prep_task = asyncio.create_task(self._prep_loop(), name="printer_prep")
+        self._retry_task = asyncio.create_task(self._retry_loop(), name="printer_retry")
 
     async def stop(self):
         # worker'ı nazikçe durdur
-        if self._worker_task:
-            self._worker_task.cancel()
+        for task in (self._worker_task, self._prep_task, self._retry_task):
+            if not task:
+                continue
+            task.cancel()
             try:
-                await self._worker_task
+                await task
             except asyncio.CancelledError:
                 pass
+        if self._pool:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+        # bekleyen durum yazımlarını boşalt
+        await asyncio.get_running_loop().run_in_executor(None, self._state_io.shutdown)
         # cihazı kapat
         await self._close_device()
 
@@ -62,10 +200,20 @@ class PrinterManager:
         return {
             "mode": self._mode,
             "connected": bool(self._connected),
-            "queue_size": self._queue.qsize(),
+            "queue_size": self._queue.qsize() + self._ready.qsize(),
+            "retry_pending": len(self._retry_heap),
         }
 
     async def connect(self, mode: str, params: Dict[str, Any]) -> Dict[str, Any]:
+        t0 = time.perf_counter()
+        result = await self._connect(mode, params)
+        self._event(
+            "connect", status=result.get("status", "error"), err=result.get("error"),
+            connect_ms=(time.perf_counter() - t0) * 1000,
+        )
+        return result
+
+    async def _connect(self, mode: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """
         mode:
           - "dummy" → params yok
@@ -109,6 +257,7 @@ class PrinterManager:
                     # Temel bir komut deneyip bağlantıyı doğrulayalım:
                     dev._raw(b"\x1b@")  # init
                     self._device = dev
+                    self._head_width = self._profile_width(dev)
                     self._mode = "usb"
                     self._connected = True
                     logger.info(f"Connected to USB printer VID={hex(vid)} PID={hex(pid)}")
@@ -134,52 +283,255 @@ class PrinterManager:
             raise RuntimeError("PRINTER_NOT_CONNECTED")
         jid = self._new_job_id()
         job = PrintJob(id=jid, kind="text", payload={"text": text, "lang": lang})
-        self._jobs[jid] = job
-        await self._queue.put(job)
+        await self._submit(job)
         return jid
 
-    async def enqueue_print_image(self, path: str) -> str:
+    async def enqueue_print_image(self, path: str, banded: bool = False) -> str:
         if not self._connected:
             raise RuntimeError("PRINTER_NOT_CONNECTED")
         jid = self._new_job_id()
-        job = PrintJob(id=jid, kind="image", payload={"path": path})
-        self._jobs[jid] = job
-        await self._queue.put(job)
+        payload: Dict[str, Any] = {"path": path}
+        if banded:
+            payload["banded"] = True
+        job = PrintJob(id=jid, kind="image", payload=payload)
+        await self._submit(job)
         return jid
 
-    async def requeue(self, job_id: str) -> bool:
-        job = self._jobs.get(job_id)
+    async def requeue(self, job_id: str) -> Optional[str]:
+        """Job'u orijinal payload'ı ile yeni bir job olarak kuyruğa alır; yeni id'yi döndürür."""
+        job = self._lookup(job_id) or await self._job_from_store(job_id)
         if not job:
-            return False
-        # Orijinal payload ile yeni job oluştur
+            return None
         jid = self._new_job_id()
         clone = PrintJob(id=jid, kind=job.kind, payload=job.payload.copy())
-        self._jobs[jid] = clone
-        await self._queue.put(clone)
-        return True
+        await self._submit(clone)
+        return jid
+
+    async def job_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._lookup(job_id)
+        return job.status() if job else await self._stored_status(job_id)
+
+    async def wait_job(self, job_id: str, timeout: float) -> Optional[Dict[str, Any]]:
+        """Job done/failed olana ya da timeout dolana kadar bekler; son durumu döndürür."""
+        job = self._lookup(job_id)
+        if not job:
+            # bellekte yoksa bitmiş (ya da önceki süreçte kalmış) job'dur: beklenecek bir şey yok
+            return await self._stored_status(job_id)
+        if timeout > 0 and not job.finished.is_set():
+            try:
+                await asyncio.wait_for(job.finished.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+        return job.status()
+
+    def referenced_paths(self) -> List[str]:
+        """Bitmemiş (kuyruk, hazır, retry, işlemde), son biten ve dead-letter job'ların dosya yolları."""
+        jobs = list(self._pending.values()) + list(self._jobs.values())
+        paths = [job.payload.get("path") for job in jobs if job.kind == "image"]
+        paths += [(rec.get("payload") or {}).get("path") for rec in self._dead_letters.list(limit=0)]
+        return [p for p in paths if p]
+
+    def dead_letters(self, limit: int = 100) -> List[Dict[str, Any]]:
+        return self._dead_letters.list(limit=limit)
+
+    async def requeue_dead_letters(self, job_ids: Optional[Iterable[str]] = None) -> Dict[str, str]:
+        """
+        Dead-letter kayıtlarını (job_ids None ise hepsini) yeni job olarak kuyruğa alır.
+        Dönüş: {eski_id: yeni_id}
+        """
+        mapping: Dict[str, str] = {}
+        for rec in self._dead_letters.pop(job_ids):
+            jid = self._new_job_id()
+            job = PrintJob(id=jid, kind=rec.get("kind", ""), payload=dict(rec.get("payload") or {}))
+            await self._submit(job)
+            mapping[rec.get("id", "")] = jid
+        return mapping
 
     # ---------- iç işler ----------
     async def _worker_loop(self):
         while True:
             try:
-                job = await self._queue.get()
+                job, prepared, banded = await self._ready.get()
+                started = time.time()
                 try:
                     if job.kind == "text":
+                        job.mark("printing")
                         await self._do_print_text(job.payload["text"], job.payload.get("lang", "tr"))
                     elif job.kind == "image":
-                        await self._do_print_image(job.payload["path"])
+                        if banded:
+                            # şeritli modda raster ve yazım iç içe
+                            job.mark("printing")
+                            await self._do_print_image_banded(job.payload["path"])
+                        else:
+                            if job.state != "rendering":
+                                job.mark("rendering")
+                            if prepared is not None:
+                                data = await prepared.result
+                            elif self._mode == "usb":
+                                # prep sırasında dummy moddaydık; kilidi tutmadan şimdi hazırla
+                                data = await self._pool_result(rasterize_image, job.payload["path"], self._target_width())
+                            else:
+                                data = None
+                            job.mark("printing")
+                            await self._do_print_image(job.payload["path"], data)
                     else:
                         logger.warning(f"Unknown job kind: {job.kind}")
+                        job.last_error = "UNKNOWN_JOB_KIND"
+                        self._finish(job, "failed")
+                        self._event(f"print_{job.kind}", status="failed", jobid=job.id, err=job.last_error)
+                        continue
                 except Exception as e:
-                    logger.exception(f"Job failed: {job.id} {e}")
+                    if isinstance(e, BrokenProcessPool) and prepared is not None:
+                        self._reset_pool(prepared.pool)
+                    self._schedule_retry(job, e)
+                else:
+                    # basıldı: buradaki hiçbir şey retry yoluna düşmemeli (yoksa fiş tekrar basılır)
+                    self._finish(job, "done")
+                    self._event(
+                        f"print_{job.kind}", jobid=job.id,
+                        wait_ms=(started - job.timestamps.get("queued", started)) * 1000,
+                        print_ms=(time.time() - started) * 1000,
+                    )
                 finally:
-                    self._queue.task_done()
+                    self._ready.task_done()
             except asyncio.CancelledError:
                 break
             except Exception:
                 logger.exception("worker_loop error")
                 await asyncio.sleep(0.2)
 
+    async def _prep_loop(self):
+        # Görsel job'ları process pool'a gönderir; hazır kuyruğu doluysa bekler (lookahead sınırı).
+        while True:
+            try:
+                job = await self._queue.get()
+                try:
+                    prepared, banded = None, False
+                    if job.kind == "image":
+                        # bir kez burada karar verilir; worker dosyayı yeniden açmaz
+                        banded = await self._wants_bands(job)
+                        if self._mode != "dummy" and not banded:
+                            prepared = self._rasterize(job.payload["path"])
+                            job.mark("rendering")
+                    await self._ready.put((job, prepared, banded))
+                except Exception as e:
+                    self._schedule_retry(job, e)
+                finally:
+                    self._queue.task_done()
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception("prep_loop error")
+                await asyncio.sleep(0.2)
+
+    async def _wants_bands(self, job: PrintJob) -> bool:
+        if job.payload.get("banded"):
+            return True
+        if self._band_threshold <= 0 or self._mode == "dummy":
+            return False
+        # yalnızca başlık okunur; yine de dosya I/O'su event loop dışında
+        loop = asyncio.get_running_loop()
+        _, height = await loop.run_in_executor(None, image_size, job.payload["path"])
+        return height > self._band_threshold
+
+    def _rasterize(self, path: str) -> _Prepared:
+        return self._pool_submit(rasterize_image, path, self._target_width())
+
+    def _pool_submit(self, fn: Any, *args: Any) -> _Prepared:
+        loop = asyncio.get_running_loop()
+        for _ in range(2):
+            if self._pool is None:
+                self._pool = ProcessPoolExecutor(max_workers=self._prep_workers)
+            pool = self._pool
+            try:
+                fut = loop.run_in_executor(pool, fn, *args)
+                return _Prepared(pool=pool, result=fut)
+            except BrokenProcessPool:
+                # pool zaten bozuk (submit anında): bir kez yenisiyle dene
+                self._reset_pool(pool)
+        raise BrokenProcessPool("prep pool could not be restarted")
+
+    async def _pool_result(self, fn: Any, *args: Any) -> Any:
+        prepared = self._pool_submit(fn, *args)
+        try:
+            return await prepared.result
+        except BrokenProcessPool:
+            self._reset_pool(prepared.pool)
+            raise
+
+    def _reset_pool(self, broken: ProcessPoolExecutor):
+        # Aynı bozuk pool'un diğer future'ları da hata verir; yalnızca hâlâ
+        # kullanılan pool o ise kapat, yenisi sonraki job'da oluşturulur.
+        if self._pool is broken:
+            self._pool = None
+            broken.shutdown(wait=False, cancel_futures=True)
+
+    def _target_width(self) -> Optional[int]:
+        # Başlıktan geniş görseller küçültülür (dev.image() burada ImageWidthError verirdi)
+        return self._print_width or self._head_width
+
+    @staticmethod
+    def _profile_width(dev: Any) -> Optional[int]:
+        try:
+            return int(dev.profile.profile_data["media"]["width"]["pixels"])
+        except (AttributeError, KeyError, TypeError, ValueError):
+            # profil genişliği bilinmiyor ("Unknown"): python-escpos gibi olduğu gibi bas
+            return None
+
+    def _schedule_retry(self, job: PrintJob, err: Exception):
+        job.attempts += 1
+        job.last_error = f"{type(err).__name__}: {err}"
+        code = _error_code(err)
+        if isinstance(err, NON_RETRYABLE_ERRORS):
+            # eksik dosya / bozuk görsel / hatalı payload: traceback gereksiz
+            logger.error(f"Job failed permanently: {job.id} {job.last_error}")
+            self._dead_letter(job, code)
+            return
+        logger.opt(exception=err).error(f"Job failed: {job.id} {err}")
+        if job.attempts > self._max_retries:
+            logger.error(f"Job dead-lettered after {job.attempts} attempts: {job.id}")
+            self._dead_letter(job, code)
+            return
+        state = RetryCallState(retry_object=None, fn=None, args=(), kwargs={})
+        state.attempt_number = job.attempts
+        delay = self._retry_wait(state)
+        logger.warning(f"Job {job.id} retry {job.attempts}/{self._max_retries} in {delay:.1f}s")
+        job.mark("queued")  # retry bekliyor
+        heapq.heappush(self._retry_heap, (time.monotonic() + delay, next(self._retry_seq), job))
+        self._retry_wakeup.set()
+        self._event("retry", status="error", jobid=job.id, err=code, backoff_ms=delay * 1000)
+
+    def _dead_letter(self, job: PrintJob, code: str):
+        self._dead_letters.add(job.id, job.kind, job.payload, job.attempts, job.last_error or "")
+        self._finish(job, "failed")
+        self._event("dead_letter", status="failed", jobid=job.id, err=code)
+
+    async def _retry_loop(self):
+        # Süresi gelen job'ları ana kuyruğa geri taşır; worker hiç beklemez.
+        while True:
+            try:
+                if not self._retry_heap:
+                    await self._retry_wakeup.wait()
+                    self._retry_wakeup.clear()
+                    continue
+                due, _, job = self._retry_heap[0]
+                delay = due - time.monotonic()
+                if delay > 0:
+                    self._retry_wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._retry_wakeup.wait(), timeout=delay)
+                    except asyncio.TimeoutError:
+                        pass
+                    continue
+                heapq.heappop(self._retry_heap)
+                job.mark("queued")
+                await self._queue.put(job)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception("retry_loop error")
+                await asyncio.sleep(0.2)
+
     async def _do_print_text(self, text: str, lang: str):
         async with self._lock:
             if self._mode == "dummy":
@@ -188,7 +540,7 @@ class PrinterManager:
 
             if self._mode == "usb":
                 if not self._device:
-                    raise RuntimeError("USB device missing")
+                    raise RuntimeError("USB_DEVICE_MISSING")
                 dev = self._device
                 # Türkçe karakterler: en stabil → cp857 (veya cp1254). 
                 # python-escpos'da codepage ayarı:
@@ -209,9 +561,10 @@ class PrinterManager:
 
             if self._mode == "lan":
                 # LAN raw (9100) sonra eklenecek
-                raise RuntimeError("LAN backend not ready")
+                raise RuntimeError("LAN_BACKEND_NOT_READY")
 
-    async def _do_print_image(self, path: str):
+    async def _do_print_image(self, path: str, data: Optional[bytes] = None):
+        # data: prep aşamasında hazırlanmış ESC/POS raster byte'ları
         async with self._lock:
             if self._mode == "dummy":
                 logger.info(f"[DUMMY] PRINT IMAGE: {path}")
@@ -219,20 +572,112 @@ class PrinterManager:
 
             if self._mode == "usb":
                 if not self._device:
-                    raise RuntimeError("USB device missing")
+                    raise RuntimeError("USB_DEVICE_MISSING")
                 dev = self._device
-                img = Image.open(Path(path)).convert("L")   # grayscale
-                # Gerekirse yeniden boyutlandır (termal başlık genişliği ~ 384 px / 576 px)
-                # img = img.resize((384, int(img.height * 384 / img.width)))
-                dev.image(img)
-                try:
-                    dev.cut()
-                except Exception:
-                    pass
+                # Cihaz yazımı ve kesim bloklayıcı; event loop'u tutmamak için thread'de
+                loop = asyncio.get_running_loop()
+                await loop.run_in_executor(None, self._write_and_cut, dev, data)
                 return
 
             if self._mode == "lan":
-                raise RuntimeError("LAN backend not ready")
+                raise RuntimeError("LAN_BACKEND_NOT_READY")
+
+    async def _do_print_image_banded(self, path: str):
+        if self._mode == "dummy":
+            async with self._lock:
+                logger.info(f"[DUMMY] PRINT IMAGE (banded): {path}")
+            return
+
+        if self._mode == "lan":
+            raise RuntimeError("LAN_BACKEND_NOT_READY")
+
+        # Yalnızca başlık okunur; reader dosyayı şerit şerit açar
+        loop = asyncio.get_running_loop()
+        try:
+            spec, reader = await loop.run_in_executor(
+                None, open_band_reader, path, self._band_height, self._target_width()
+            )
+        except NON_RETRYABLE_ERRORS:
+            raise
+        except Exception as e:
+            raise ImageDecodeError(f"{type(e).__name__}: {e}") from e
+        if reader is None:
+            # şeritli okuma desteklenmeyen format: tek parça raster (pool'da)
+            data = await self._pool_result(rasterize_image, path, self._target_width())
+            await self._do_print_image(path, data)
+            return
+
+        bands: asyncio.Queue[Any] = asyncio.Queue(maxsize=2)
+        producer = asyncio.create_task(self._render_bands(spec, reader, bands), name="printer_bands")
+        try:
+            # ilk şerit hazır olmadan cihazı kilitleme
+            item = await bands.get()
+            async with self._lock:
+                if self._mode != "usb" or not self._device:
+                    raise RuntimeError("USB_DEVICE_MISSING")
+                dev = self._device
+                written = 0
+                try:
+                    while item is not None:
+                        if isinstance(item, BaseException):
+                            raise item
+                        await loop.run_in_executor(None, dev._raw, item)
+                        written += 1
+                        item = await bands.get()
+                except Exception as e:
+                    if not written:
+                        raise
+                    # kağıda bir kısmı çıktı: baştan denemek aynı parçayı yeniden basar;
+                    # kes ve dead-letter'a bırak (elle reprint edilebilir)
+                    await loop.run_in_executor(None, self._write_and_cut, dev, None)
+                    raise PartialPrintError(f"{written} band(s) printed, then {type(e).__name__}: {e}") from e
+                await loop.run_in_executor(None, self._write_and_cut, dev, None)
+        finally:
+            producer.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await producer
+            with contextlib.suppress(ValueError):  # reader thread'de hâlâ çalışıyorsa GC kapatır
+                reader.close()
+
+    @staticmethod
+    def _write_and_cut(dev: Any, data: Optional[bytes]):
+        # executor'da: raster yazımı (varsa) + kesim tek çağrıda
+        if data is not None:
+            dev._raw(data)
+        try:
+            dev.cut()
+        except Exception:
+            pass
+
+    async def _render_bands(self, spec: Dict[str, Any], reader: Any, out: asyncio.Queue):
+        """
+        Şeritleri sırayla okur (thread) ve process pool'da raster eder. Çıkış kuyruğu
+        2 şeritle sınırlı: cihaz yavaşsa (USB/TCP yazımı bloklanır) okuma/raster da bekler.
+        Bir şeridin son ham satırı ve dither bağlamı bir sonrakine taşınır.
+        """
+        loop = asyncio.get_running_loop()
+        prev_raw, context = b"", b""
+        try:
+            while True:
+                item = await loop.run_in_executor(None, next, reader, None)
+                if item is None:
+                    break
+                data, rows, out_rows = item
+                raster, prev_raw, context = await self._pool_result(
+                    render_band, spec, data, rows, out_rows, prev_raw, context
+                )
+                if raster:
+                    await out.put(raster)
+            await out.put(None)
+        except asyncio.CancelledError:
+            raise
+        except BrokenProcessPool as e:
+            await out.put(e)
+        except Exception as e:
+            # kesik/bozuk veri (OSError, struct.error, zlib.error, ValueError...)
+            err = ImageDecodeError(f"{type(e).__name__}: {e}")
+            err.__cause__ = e
+            await out.put(err)
 
     async def _close_device(self):
         if self._device:
@@ -241,8 +686,87 @@ class PrinterManager:
             except Exception:
                 pass
         self._device = None
+        self._head_width = None
         if self._mode != "dummy":
             self._connected = False
 
+    async def _read_state(self, job_id: str) -> Optional[Dict[str, Any]]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._state_io, self._states.get, job_id)
+
+    async def _stored_status(self, job_id: str) -> Optional[Dict[str, Any]]:
+        rec = await self._read_state(job_id)
+        if not rec:
+            return None
+        status = {k: rec.get(k) for k in ("jobid", "kind", "state", "attempts", "last_error", "timestamps")}
+        if status["state"] not in FINAL_STATES:
+            # bitmemiş job'lar _pending'den çıkmaz: bu kayıt yeniden başlatılan bir sürece ait
+            status["state"] = "failed"
+            status["last_error"] = "INTERRUPTED"
+        return status
+
+    async def _job_from_store(self, job_id: str) -> Optional[PrintJob]:
+        # Önce sınırlı durum dosyası (kuyruk jobid'leri, reprint / dead-letter dahil),
+        # sonra JobStore (kendi id'si ya da kuyruk jobid'si) tek geçişte, event loop dışında
+        state = await self._read_state(job_id)
+        if state and state.get("kind") in ("text", "image") and state.get("payload"):
+            return PrintJob(id=job_id, kind=state["kind"], payload=dict(state["payload"]))
+        loop = asyncio.get_running_loop()
+        rec = await loop.run_in_executor(None, self._store.find, job_id)
+        if not rec:
+            return None
+        payload = rec.get("payload") or {}
+        if rec.get("type") == "text":
+            return PrintJob(id=job_id, kind="text", payload={"text": payload.get("text", ""), "lang": payload.get("lang", "tr")})
+        if rec.get("type") == "file" and payload.get("path"):
+            image_payload: Dict[str, Any] = {"path": payload["path"]}
+            if payload.get("banded"):
+                image_payload["banded"] = True
+            return PrintJob(id=job_id, kind="image", payload=image_payload)
+        return None
+
+    async def _submit(self, job: PrintJob):
+        job.mark("queued")
+        self._pending[job.id] = job
+        self._save_state(job, with_payload=True)
+        await self._queue.put(job)
+        self._event("enqueue", status="queued", jobid=job.id)
+
+    def _finish(self, job: PrintJob, state: str):
+        # biten job sınırlı kayda geçer; bundan sonra LRU/TTL ile atılabilir
+        if state == "done":
+            job.last_error = None  # önceki denemelerin hatası başarılı job'da kalmasın
+        job.mark(state)
+        self._pending.pop(job.id, None)
+        try:
+            self._jobs[job.id] = job
+        except Exception:
+            # kayıt yalnızca sorgu içindir; job'un sonucu değişmez
+            logger.exception(f"job registry update failed: {job.id}")
+        self._save_state(job)
+
+    def _save_state(self, job: PrintJob, with_payload: bool = False):
+        # payload yalnızca ilk kayıtta; yazım I/O thread'inde, event loop beklemez
+        payload = dict(job.payload) if with_payload else None
+        try:
+            self._state_io.submit(self._write_state, job.status(), payload)
+        except Exception:
+            logger.exception(f"job state could not be saved: {job.id}")
+
+    def _write_state(self, status: Dict[str, Any], payload: Optional[Dict[str, Any]]):
+        try:
+            self._states.save(status, payload)
+        except Exception:
+            logger.exception(f"job state could not be saved: {status.get('jobid')}")
+
+    def _lookup(self, job_id: str) -> Optional[PrintJob]:
+        return self._pending.get(job_id) or self._jobs.get(job_id)
+
+    def _event(
+        self, op: str, status: str = "ok", jobid: Optional[str] = None, err: Optional[str] = None, **durations: float
+    ):
+        if self._journal:
+            self._journal.record(op, device=self._mode, status=status, jobid=jobid, err=err, **durations)
+
     def _new_job_id(self) -> str:
         return f"{uuid.uuid4()}"
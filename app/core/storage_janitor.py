@@ -0,0 +1,106 @@
+# app/core/storage_janitor.py
+from __future__ import annotations
+import asyncio
+import os
+import time
+from pathlib import Path
+from typing import Callable, Iterable, List, Optional, Set, Tuple
+from loguru import logger
+
+from app.core.job_store import DATA_DIR
+
+UPLOADS_DIR = DATA_DIR / "uploads"
+TMP_DIR = DATA_DIR / "tmp"
+
+def _norm(path: str) -> str:
+    return os.path.normcase(os.path.abspath(path))
+
+class StorageJanitor:
+    """
+    data/uploads ve data/tmp altındaki dosyaları yaş/boyut kotasına göre siler.
+      - max_age:   saniye; daha eski dosyalar silinir
+      - max_bytes: toplam boyut bunu aşarsa en eski dosyalardan başlanarak silinir
+      - protected: güncel job'ların referans verdiği yolları döndüren callable;
+                   bu dosyalara hiç dokunulmaz
+    """
+    def __init__(
+        self,
+        dirs: Iterable[Path] = (UPLOADS_DIR, TMP_DIR),
+        max_bytes: int = 512 * 1024 * 1024,
+        max_age: float = 7 * 24 * 3600,
+        interval: float = 600.0,
+        protected: Optional[Callable[[], Iterable[str]]] = None,
+    ) -> None:
+        self.dirs = [Path(d) for d in dirs]
+        self.max_bytes = int(max_bytes)
+        self.max_age = float(max_age)
+        self.interval = float(interval)
+        self._protected = protected
+        self._task: Optional[asyncio.Task] = None
+
+    # ---------- lifecycle ----------
+    def start(self):
+        if self._task and not self._task.done():
+            return
+        self._task = asyncio.create_task(self._loop(), name="storage_janitor")
+
+    async def stop(self):
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+
+    async def run_once(self) -> int:
+        keep: Set[str] = set()
+        if self._protected:
+            keep = {_norm(p) for p in self._protected() if p}
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self._collect, keep)
+
+    # ---------- iç işler ----------
+    async def _loop(self):
+        while True:
+            try:
+                removed = await self.run_once()
+                if removed:
+                    logger.info(f"Janitor removed {removed} file(s)")
+                await asyncio.sleep(self.interval)
+            except asyncio.CancelledError:
+                break
+            except Exception:
+                logger.exception("janitor error")
+                await asyncio.sleep(self.interval)
+
+    def _collect(self, keep: Set[str]) -> int:
+        now = time.time()
+        files: List[Tuple[float, int, Path]] = []  # (mtime, size, path)
+        for d in self.dirs:
+            if not d.is_dir():
+                continue
+            for p in d.iterdir():
+                try:
+                    st = p.stat()
+                except OSError:
+                    continue
+                if p.is_file():
+                    files.append((st.st_mtime, st.st_size, p))
+
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        files.sort(key=lambda f: f[0])  # en eskiden yeniye
+        for mtime, size, p in files:
+            too_old = self.max_age > 0 and now - mtime > self.max_age
+            over_quota = self.max_bytes > 0 and total > self.max_bytes
+            if not (too_old or over_quota):
+                continue
+            if _norm(str(p)) in keep:
+                continue
+            try:
+                p.unlink()
+            except OSError:
+                continue
+            total -= size
+            removed += 1
+        return removed
@@ -3,7 +3,10 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from loguru import logger
 import os
+import asyncio
 from app.core.printer_manager import PrinterManager
+from app.core.storage_janitor import StorageJanitor
+from app.core.event_journal import EventJournal
 
 
 
@@ -32,8 +35,9 @@ from app.api.routes import router as api_router
 app.include_router(api_router)
 
 # 4) Loglar
+# Uygulama logu: düz metin, loguru'nun arka plan kuyruğu üzerinden (enqueue=True)
 os.makedirs("app/logs", exist_ok=True)
-logger.add("app/logs/logs.json", rotation="1 MB", serialize=True)
+logger.add("app/logs/app.log", rotation="1 MB", retention=5, compression="gz", enqueue=True)
 
 # 5) Basit test endpoint
 @app.get("/")
@@ -49,9 +53,24 @@ if __name__ == "__main__":
 # --- APP STATE: PrinterManager (startup/shutdown) ---
 @app.on_event("startup")
 async def on_startup():
-    app.state.manager = PrinterManager()       # type: ignore[attr-defined]
+    # Yazdırma olay günlüğü (/logs); rotasyon/sıkıştırma ortam değişkenleriyle ayarlanır
+    app.state.journal = EventJournal(          # type: ignore[attr-defined]
+        max_bytes=int(os.getenv("EVENT_LOG_MAX_BYTES", 5 * 1024 * 1024)),
+        backups=int(os.getenv("EVENT_LOG_BACKUPS", 5)),
+        compress=os.getenv("EVENT_LOG_COMPRESS", "1").lower() not in ("0", "false", "no"),
+    )
+    app.state.journal.start()                  # type: ignore[attr-defined]
+    app.state.manager = PrinterManager(journal=app.state.journal)  # type: ignore[attr-defined]
+    # uploads/tmp çöp toplayıcı; güncel job'ların dosyalarına dokunmaz
+    app.state.janitor = StorageJanitor(protected=app.state.manager.referenced_paths)  # type: ignore[attr-defined]
+    app.state.janitor.start()                  # type: ignore[attr-defined]
 
 @app.on_event("shutdown")
 async def on_shutdown():
+    janitor: StorageJanitor = app.state.janitor  # type: ignore[attr-defined]
+    await janitor.stop()
     mgr: PrinterManager = app.state.manager    # type: ignore[attr-defined]
-    await mgr.stop()
\ No newline at end of file
+    await mgr.stop()
+    journal: EventJournal = app.state.journal  # type: ignore[attr-defined]
+    # kalan olayları boşaltırken event loop'u bloklama
+    await asyncio.get_running_loop().run_in_executor(None, journal.close)
\ No newline at end of file
@@ -1,9 +1,13 @@
  
 # -*- coding: utf-8 -*-
-from PIL import Image, ImageDraw, ImageFont
+from PIL import Image, ImageDraw, ImageFont, ImageOps
+from typing import Any, Dict, Iterator, Optional, Tuple
+import io
 import os
+import struct
 import textwrap
 import uuid
+import zlib
 
 def text_to_image(text: str, lang: str = "tr", width: int = 384) -> str:
     """
@@ -36,3 +40,298 @@ def text_to_image(text: str, lang: str = "tr", width: int = 384) -> str:
     path = os.path.join("data", "tmp", filename)
     img.save(path)
     return path
+
+
+# ESC/POS "GS v 0" raster parçalarının en fazla satır sayısı
+# (python-escpos'un varsayılan fragment_height değeriyle aynı)
+RASTER_FRAGMENT_HEIGHT = 960
+
+def raster_command(bw: Image.Image) -> bytes:
+    """
+    1-bit (mode "1", siyah=1 olacak şekilde ters çevrilmiş) görseli
+    tek bir GS v 0 komutuna çevirir.
+    """
+    width_bytes = (bw.width + 7) // 8
+    header = b"\x1d\x76\x30\x00" + bytes((
+        width_bytes & 0xFF, (width_bytes >> 8) & 0xFF,
+        bw.height & 0xFF, (bw.height >> 8) & 0xFF,
+    ))
+    # mode "1" tobytes: satır başına MSB-first paketli bit, satır sonu 0 ile doldurulur
+    return header + bw.tobytes()
+
+def flatten_on_white(img: Image.Image) -> Image.Image:
+    """
+    Saydamlığı (RGBA/LA/P + transparency) beyaz zemine yapıştırarak atar;
+    python-escpos EscposImage ile aynı davranış (saydam alan = boş kağıt).
+    """
+    if img.mode in ("RGBA", "LA", "PA") or "transparency" in img.info:
+        rgba = img.convert("RGBA")
+        bg = Image.new("RGB", rgba.size, (255, 255, 255))
+        bg.paste(rgba, mask=rgba.split()[3])
+        return bg
+    return img
+
+def to_printable(img: Image.Image, max_width: Optional[int] = None) -> Image.Image:
+    """
+    Saydamlık → beyaz, grayscale + (gerekirse) küçültme + Floyd-Steinberg ile 1-bit.
+    Termal yazıcıda 1 = siyah nokta olduğu için görsel önce ters çevrilir.
+    """
+    if getattr(img, "format", None) == "JPEG":
+        # DCT ölçekleme ile doğrudan gri ve (mümkünse) küçük decode: daha az bellek
+        w, h = img.size
+        target = (max_width, max(1, h * max_width // w)) if max_width and w > max_width else (w, h)
+        img.draft("L", target)
+    img = flatten_on_white(img).convert("L")
+    if max_width and img.width > max_width:
+        img = img.resize((max_width, max(1, int(img.height * max_width / img.width))))
+    return ImageOps.invert(img).convert("1")
+
+def rasterize_image(path: str, max_width: Optional[int] = None) -> bytes:
+    """
+    Görseli diskten okuyup cihaza doğrudan yazılabilecek ESC/POS raster
+    byte'larına çevirir. Process pool'da çalışır (üst seviye, picklable).
+    """
+    with Image.open(path) as src:
+        bw = to_printable(src, max_width)
+    out = bytearray()
+    for top in range(0, bw.height, RASTER_FRAGMENT_HEIGHT):
+        frag = bw.crop((0, top, bw.width, min(bw.height, top + RASTER_FRAGMENT_HEIGHT)))
+        out += raster_command(frag)
+    return bytes(out)
+
+def image_size(path: str) -> Tuple[int, int]:
+    """Yalnızca başlığı okuyarak (decode etmeden) görsel boyutunu döndürür."""
+    with Image.open(path) as im:
+        return im.size
+
+# ---------- şeritli (banded) raster ----------
+# Dither için önceki şeritten taşınan gri satır sayısı: Floyd-Steinberg hatası
+# bu satırlarda "ısınır", şerit sınırında dikiş izi kalmaz. Sonuç tek parça
+# dither ile bit bit aynı değildir (gri seviyeler aynıdır, nokta deseni farklı olabilir).
+BAND_DITHER_CONTEXT = 32
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+# PNG renk tipi -> kanal sayısı
+_PNG_CHANNELS = {0: 1, 2: 3, 3: 1, 4: 2, 6: 4}
+# Filtre bayt/piksel (bpp) değeri aynı olan 8-bit PNG renk tipi (filtre çözümü için)
+_PNG_BPP_TYPES = {1: 0, 2: 4, 3: 2, 4: 6}
+# stride verilmeyen raw tile'lar için piksel başına bit
+_RAW_BITS = {
+    "1": 1, "1;I": 1, "1;R": 1, "L": 8, "P": 8,
+    "RGB": 24, "BGR": 24, "RGBA": 32, "BGRA": 32, "RGBX": 32, "BGRX": 32,
+}
+
+BandReader = Iterator[Tuple[bytes, int, int]]  # (veri, kaynak satır, çıktı satırı)
+
+def open_band_reader(
+    path: str, band_height: int = 256, max_width: Optional[int] = None
+) -> Tuple[Dict[str, Any], Optional[BandReader]]:
+    """
+    Görseli tamamını decode etmeden şerit şerit okuyan bir reader döndürür.
+    Desteklenenler: interlace'sız PNG (piksel başına en fazla 4 bayt) ve
+    Pillow "raw" tile'lı formatlar (BMP, PPM, TGA, sıkıştırılmamış TIFF).
+    Diğerlerinde reader None'dır; çağıran tüm görseli raster etmelidir.
+    spec, render_band()'e aynen verilir (picklable).
+    """
+    band_height = max(1, int(band_height))
+    with Image.open(path) as src:
+        w, h = src.size
+        out_w = max_width if max_width and w > max_width else w
+        spec: Dict[str, Any] = {
+            "size": (w, h),
+            "mode": src.mode,
+            "out_width": out_w,
+            "transparency": src.info.get("transparency"),
+            "palette": None,
+        }
+        if src.mode == "P" and src.palette is not None:
+            pal = src.palette
+            spec["palette"] = (pal.rawmode, pal.palette) if pal.rawmode else ("RGB", pal.tobytes())
+        tile = src.tile
+        if len(tile) != 1 or tuple(tile[0][1]) != (0, 0, w, h):
+            return spec, None
+        codec, _, offset, args = tile[0]
+
+    if codec == "zip":
+        with open(path, "rb") as f:
+            head = f.read(33)
+        if head[:8] != PNG_SIGNATURE or head[12:16] != b"IHDR":
+            return spec, None
+        depth, color_type, interlace = head[24], head[25], head[28]
+        bits = depth * _PNG_CHANNELS.get(color_type, 0)
+        bpp = max(1, bits // 8)
+        if interlace or bpp not in _PNG_BPP_TYPES:
+            return spec, None
+        spec.update(kind="png", rawmode=args, row_bytes=(w * bits + 7) // 8, bpp=bpp)
+        return spec, _png_bands(path, spec, band_height)
+
+    if codec == "raw":
+        rawmode, stride, orientation = args if isinstance(args, tuple) else (args, 0, 1)
+        if not stride:
+            bits = _RAW_BITS.get(rawmode)
+            if bits is None:
+                return spec, None
+            stride = (w * bits + 7) // 8
+        spec.update(kind="raw", rawmode=rawmode, stride=stride, orientation=orientation or 1)
+        return spec, _raw_bands(path, spec, offset, band_height)
+
+    return spec, None
+
+def _out_rows(spec: Dict[str, Any], top: int, bottom: int) -> int:
+    # kümülatif yuvarlama: şerit sınırlarında satır kaybı/tekrarı olmaz
+    w, _ = spec["size"]
+    scale = spec["out_width"] / w
+    return int(bottom * scale) - int(top * scale)
+
+def _png_bands(path: str, spec: Dict[str, Any], band_height: int) -> BandReader:
+    """IDAT verisini zlib ile akış halinde açar; her şerit için filtreli satırları verir."""
+    _, h = spec["size"]
+    line = spec["row_bytes"] + 1  # filtre baytı + satır
+    with open(path, "rb") as f:
+        f.seek(8)
+        while True:
+            length, ctype = struct.unpack(">I4s", f.read(8))
+            if ctype == b"IDAT":
+                break
+            if ctype == b"IEND":
+                raise OSError("PNG has no image data")
+            f.seek(length + 4, os.SEEK_CUR)
+        inflater = zlib.decompressobj()
+        remaining = length  # mevcut IDAT chunk'ında okunmamış bayt
+
+        def read(n: int) -> bytes:
+            nonlocal remaining
+            buf = bytearray()
+            while len(buf) < n:
+                if inflater.unconsumed_tail:
+                    buf += inflater.decompress(inflater.unconsumed_tail, n - len(buf))
+                    continue
+                if remaining == 0:
+                    f.seek(4, os.SEEK_CUR)  # CRC
+                    length, ctype = struct.unpack(">I4s", f.read(8))
+                    if ctype != b"IDAT":
+                        break
+                    remaining = length
+                    continue
+                chunk = f.read(min(64 * 1024, remaining))
+                if not chunk:
+                    break
+                remaining -= len(chunk)
+                buf += inflater.decompress(chunk, n - len(buf))
+            return bytes(buf)
+
+        for top in range(0, h, band_height):
+            rows = min(band_height, h - top)
+            data = read(rows * line)
+            if len(data) < rows * line:
+                raise OSError("PNG image data is truncated")
+            yield data, rows, _out_rows(spec, top, top + rows)
+
+def _raw_bands(path: str, spec: Dict[str, Any], offset: int, band_height: int) -> BandReader:
+    _, h = spec["size"]
+    stride = spec["stride"]
+    with open(path, "rb") as f:
+        for top in range(0, h, band_height):
+            rows = min(band_height, h - top)
+            # orientation -1: dosyada satırlar aşağıdan yukarı
+            first = h - top - rows if spec["orientation"] < 0 else top
+            f.seek(offset + first * stride)
+            data = f.read(rows * stride)
+            if len(data) < rows * stride:
+                raise OSError("image file is truncated")
+            yield data, rows, _out_rows(spec, top, top + rows)
+
+def _png_chunk(ctype: bytes, data: bytes) -> bytes:
+    return struct.pack(">I", len(data)) + ctype + data + struct.pack(">I", zlib.crc32(ctype + data))
+
+def _png_unfilter(spec: Dict[str, Any], filtered: bytes, rows: int, prev_raw: bytes) -> bytes:
+    """
+    Filtreli PNG satırlarını Pillow'un C filtre çözücüsüyle açar: aynı bpp'li
+    8-bit sahte bir PNG kurulur, ilk satırı önceki şeridin son (çözülmüş) satırıdır.
+    """
+    rb, bpp = spec["row_bytes"], spec["bpp"]
+    stream = b"\x00" + (prev_raw or bytes(rb)) + filtered
+    ihdr = struct.pack(">IIBBBBB", rb // bpp, rows + 1, 8, _PNG_BPP_TYPES[bpp], 0, 0, 0)
+    png = (
+        PNG_SIGNATURE
+        + _png_chunk(b"IHDR", ihdr)
+        + _png_chunk(b"IDAT", zlib.compress(stream, 0))
+        + _png_chunk(b"IEND", b"")
+    )
+    with Image.open(io.BytesIO(png)) as im:
+        return im.tobytes()[rb:]
+
+def decode_band(spec: Dict[str, Any], data: bytes, rows: int, prev_raw: bytes) -> Tuple[Image.Image, bytes]:
+    """Reader'ın verdiği şerit verisini görsele çevirir; dönüş (görsel, son ham PNG satırı)."""
+    w, _ = spec["size"]
+    if spec["kind"] == "png":
+        raw = _png_unfilter(spec, data, rows, prev_raw)
+        last_raw = raw[-spec["row_bytes"]:]
+        img = Image.frombytes(spec["mode"], (w, rows), raw, "raw", spec["rawmode"])
+    else:
+        last_raw = b""
+        img = Image.frombytes(
+            spec["mode"], (w, rows), data, "raw", spec["rawmode"], spec["stride"], spec["orientation"]
+        )
+    if spec["palette"]:
+        rawmode, pal = spec["palette"]
+        img.putpalette(pal, rawmode)
+    if spec["transparency"] is not None:
+        img.info["transparency"] = spec["transparency"]
+    return img, last_raw
+
+def band_to_gray(spec: Dict[str, Any], img: Image.Image, out_rows: int) -> Image.Image:
+    """Şeridi beyaz zemine oturtup gri tona çevirir ve çıktı boyutuna ölçekler."""
+    out_w = spec["out_width"]
+    gray = flatten_on_white(img).convert("L")
+    if gray.size != (out_w, out_rows):
+        gray = gray.resize((out_w, out_rows))
+    return gray
+
+def render_band(
+    spec: Dict[str, Any], data: bytes, rows: int, out_rows: int, prev_raw: bytes, context: bytes
+) -> Tuple[bytes, bytes, bytes]:
+    """
+    Tek bir şeridi raster eder. Process pool'da çalışır (üst seviye, picklable).
+    Şeritler sırayla işlenir; dönüş (raster, son ham satır, dither bağlamı)
+    bir sonraki şeride prev_raw / context olarak verilir.
+    """
+    img, last_raw = decode_band(spec, data, rows, prev_raw)
+    if out_rows <= 0:
+        return b"", last_raw, context
+
+    out_w = spec["out_width"]
+    gray = band_to_gray(spec, img, out_rows)
+    ctx_rows = len(context) // out_w
+    if ctx_rows:
+        stacked = Image.new("L", (out_w, ctx_rows + out_rows))
+        stacked.paste(Image.frombytes("L", (out_w, ctx_rows), context), (0, 0))
+        stacked.paste(gray, (0, ctx_rows))
+    else:
+        stacked = gray
+    bw = ImageOps.invert(stacked).convert("1")
+    if ctx_rows:
+        bw = bw.crop((0, ctx_rows, out_w, ctx_rows + out_rows))
+    keep = BAND_DITHER_CONTEXT * out_w
+    new_context = (context + gray.tobytes())[-keep:] if keep > 0 else b""
+    return raster_command(bw), last_raw, new_context
+
+def iter_raster_bands(path: str, band_height: int = 256, max_width: Optional[int] = None) -> Iterator[bytes]:
+    """
+    Görseli sabit yükseklikli şeritler halinde okuyup her şeridi ayrı bir GS v 0
+    komutu olarak üretir (aynı süreçte, sırayla). Bellek şerit boyutundadır ve
+    ilk şerit görselin geri kalanı okunmadan hazırdır. Şeritli okuma desteklenmeyen
+    formatlarda (JPEG, GIF, interlaced PNG...) görsel bir kez raster edilip bölünür.
+    """
+    spec, reader = open_band_reader(path, band_height, max_width)
+    if reader is None:
+        with Image.open(path) as src:
+            bw = to_printable(src, max_width)
+        for top in range(0, bw.height, max(1, int(band_height))):
+            yield raster_command(bw.crop((0, top, bw.width, min(bw.height, top + band_height))))
+        return
+    prev_raw, context = b"", b""
+    for data, rows, out_rows in reader:
+        raster, prev_raw, context = render_band(spec, data, rows, out_rows, prev_raw, context)
+        if raster:
+            yield raster
@@ -0,0 +1,173 @@
+# tests/test_image_tools.py
+# Şeritli okuyucu: her format için şerit şerit gri çıktı, tüm görseli tek seferde
+# decode etmekle aynı olmalı (dither hariç; o şerit sınırında bilerek farklıdır).
+import zlib
+
+import pytest
+from PIL import Image, ImageChops
+
+from app.utils.image_tools import (
+    RASTER_FRAGMENT_HEIGHT,
+    band_to_gray,
+    decode_band,
+    flatten_on_white,
+    iter_raster_bands,
+    open_band_reader,
+)
+
+W, H = 97, 301  # tek sayılar: satır baytı/şerit sınırı hizalanmasın
+BAND = 64
+
+def _source(mode: str) -> Image.Image:
+    # gürültü + gradyan: PNG filtrelerinin hepsi (Sub/Up/Avg/Paeth) devreye girer
+    noise = Image.effect_noise((W, H), 80)
+    grad = Image.linear_gradient("L").resize((W, H))
+    rgb = Image.merge("RGB", (noise, grad, ImageChops.invert(grad)))
+    if mode == "RGBA":
+        rgb.putalpha(grad.rotate(90, expand=False))
+        return rgb
+    if mode == "LA":
+        la = noise.convert("LA")
+        la.putalpha(grad)
+        return la
+    if mode == "P":
+        return rgb.quantize(64)
+    if mode == "I;16":
+        return grad.convert("I").point(lambda v: v * 257).convert("I;16")
+    return rgb.convert(mode)
+
+def _banded_gray(path: str, band_height: int = BAND, max_width=None) -> Image.Image:
+    spec, reader = open_band_reader(path, band_height, max_width)
+    assert reader is not None, "format şeritli okunabilmeli"
+    out = Image.new("L", (spec["out_width"], 0))
+    prev_raw = b""
+    for data, rows, out_rows in reader:
+        img, prev_raw = decode_band(spec, data, rows, prev_raw)
+        gray = band_to_gray(spec, img, out_rows)
+        stacked = Image.new("L", (out.width, out.height + gray.height))
+        stacked.paste(out, (0, 0))
+        stacked.paste(gray, (0, out.height))
+        out = stacked
+    return out
+
+def _full_gray(path: str, max_width=None) -> Image.Image:
+    with Image.open(path) as im:
+        gray = flatten_on_white(im).convert("L")
+    if max_width and gray.width > max_width:
+        gray = gray.resize((max_width, int(gray.height * max_width / gray.width)))
+    return gray
+
+def _assert_same(a: Image.Image, b: Image.Image):
+    assert a.size == b.size
+    assert ImageChops.difference(a, b).getbbox() is None
+
+def _png_depth(path: str) -> int:
+    with open(path, "rb") as f:
+        return f.read(25)[24]  # IHDR bit derinliği
+
+@pytest.mark.parametrize("mode, save_args, depth", [
+    ("1", {}, 1),
+    ("L", {}, 8),
+    ("RGB", {}, 8),
+    ("RGBA", {}, 8),
+    ("LA", {}, 8),
+    ("I;16", {}, 16),           # 16-bit gri
+    ("P", {}, 8),               # palet
+    ("P", {"bits": 2}, 2),
+    ("P", {"bits": 4}, 4),
+    ("L", {"optimize": True}, 8),
+])
+def test_png_bands_match_full_decode(tmp_path, mode, save_args, depth):
+    path = str(tmp_path / "img.png")
+    src = _source(mode)
+    if save_args.get("bits"):
+        src = src.convert("RGB").quantize(2 ** save_args["bits"])
+    src.save(path, **save_args)
+    assert _png_depth(path) == depth
+    _assert_same(_banded_gray(path), _full_gray(path))
+
+def test_png_palette_with_transparency(tmp_path):
+    path = str(tmp_path / "img.png")
+    img = _source("P")
+    img.save(path, transparency=3)
+    spec, _ = open_band_reader(path, BAND)
+    assert spec["transparency"] == 3
+    _assert_same(_banded_gray(path), _full_gray(path))
+
+def test_png_band_height_one_and_taller_than_image(tmp_path):
+    path = str(tmp_path / "img.png")
+    _source("RGB").save(path)
+    _assert_same(_banded_gray(path, band_height=1), _full_gray(path))
+    _assert_same(_banded_gray(path, band_height=H * 2), _full_gray(path))
+
+@pytest.mark.parametrize("mode", ["RGB", "L", "1", "P"])
+def test_bmp_bottom_up_bands_match_full_decode(tmp_path, mode):
+    path = str(tmp_path / "img.bmp")
+    _source(mode).save(path)
+    spec, _ = open_band_reader(path, BAND)
+    assert spec["kind"] == "raw" and spec["orientation"] == -1  # BMP satırları aşağıdan yukarı
+    _assert_same(_banded_gray(path), _full_gray(path))
+
+@pytest.mark.parametrize("ext", ["ppm", "tga", "tif"])
+def test_raw_formats_match_full_decode(tmp_path, ext):
+    path = str(tmp_path / f"img.{ext}")
+    _source("RGB").save(path)
+    _assert_same(_banded_gray(path), _full_gray(path))
+
+def test_scaled_width_keeps_row_count(tmp_path):
+    # şerit başına ölçekleme sınırlarda komşu satırı görmez: birebir değil, yakın olmalı
+    path = str(tmp_path / "img.png")
+    Image.linear_gradient("L").resize((W * 4, H)).save(path)
+    banded = _banded_gray(path, max_width=W)
+    full = _full_gray(path, max_width=W)
+    assert banded.size == full.size
+    diff = ImageChops.difference(banded, full)
+    assert max(diff.getdata()) <= 8
+
+def test_unsupported_formats_fall_back(tmp_path):
+    jpg = str(tmp_path / "img.jpg")
+    _source("RGB").save(jpg)
+    assert open_band_reader(jpg, BAND)[1] is None
+    # fallback yolu da aynı raster yüksekliğini üretir
+    assert sum(1 for _ in iter_raster_bands(jpg, BAND)) == -(-H // BAND)
+
+def test_raster_bands_cover_image_height(tmp_path):
+    path = str(tmp_path / "img.png")
+    _source("RGBA").save(path)
+    total = 0
+    for cmd in iter_raster_bands(path, BAND, max_width=48):
+        assert cmd[:4] == b"\x1dv0\x00"
+        width_bytes = cmd[4] | cmd[5] << 8
+        rows = cmd[6] | cmd[7] << 8
+        assert width_bytes == 6 and rows <= min(BAND, RASTER_FRAGMENT_HEIGHT)
+        total += rows
+    assert total == int(H * 48 / W)
+
+def test_transparent_png_prints_white(tmp_path):
+    path = str(tmp_path / "clear.png")
+    Image.new("RGBA", (W, H), (0, 0, 0, 0)).save(path)
+    for cmd in iter_raster_bands(path, BAND):
+        assert not any(cmd[8:])
+
+@pytest.mark.parametrize("ext", ["png", "bmp"])
+def test_truncated_input_raises(tmp_path, ext):
+    full = tmp_path / f"full.{ext}"
+    _source("RGB").save(str(full))
+    data = full.read_bytes()
+    cut = tmp_path / f"cut.{ext}"
+    cut.write_bytes(data[: len(data) // 2])
+    with pytest.raises(OSError):
+        for _ in iter_raster_bands(str(cut), BAND):
+            pass
+
+def test_corrupt_png_data_raises(tmp_path):
+    full = tmp_path / "full.png"
+    _source("RGB").save(str(full))
+    data = bytearray(full.read_bytes())
+    idat = data.index(b"IDAT")
+    data[idat + 40: idat + 80] = b"\xff" * 40
+    bad = tmp_path / "bad.png"
+    bad.write_bytes(bytes(data))
+    with pytest.raises((OSError, ValueError, zlib.error)):
+        for _ in iter_raster_bands(str(bad), BAND):
+            pass
@@ -0,0 +1,213 @@
+# tests/test_printer_manager.py
+# Retry heap / backoff / dead-letter akışı; gerçek cihaz yerine sahte USB cihazı.
+import asyncio
+import time
+
+from PIL import Image
+
+from app.core.dead_letter import DeadLetterStore
+from app.core.job_store import JobStateStore, JobStore
+from app.core.printer_manager import PrinterManager, PrintJob
+
+class FakeDevice:
+    """python-escpos Usb yerine: basılan metinleri tutar, ilk `fail` denemede hata verir."""
+    def __init__(self, fail: int = 0):
+        self.fail = fail
+        self.printed = []
+        self.raw_writes = 0
+        self.cuts = 0
+
+    def set(self, **kwargs):
+        pass
+
+    def text(self, text):
+        if self.fail:
+            self.fail -= 1
+            raise OSError("USB write timeout")
+        self.printed.append(text.strip())
+
+    def _raw(self, data):
+        self.raw_writes += 1
+
+    def cut(self):
+        self.cuts += 1
+
+    def close(self):
+        pass
+
+def _manager(tmp_path, device=None, **kwargs) -> PrinterManager:
+    kwargs.setdefault("retry_initial", 0.01)
+    kwargs.setdefault("retry_max", 0.02)
+    mgr = PrinterManager(
+        dead_letters=DeadLetterStore(tmp_path / "dead_letter.jsonl"),
+        store=JobStore(tmp_path / "print_jobs.jsonl"),
+        states=JobStateStore(tmp_path / "job_states.jsonl"),
+        **kwargs,
+    )
+    if device is not None:
+        mgr._mode = "usb"
+        mgr._device = device
+    return mgr
+
+def test_transient_failure_is_retried_until_printed(tmp_path):
+    async def run():
+        dev = FakeDevice(fail=2)
+        mgr = _manager(tmp_path, dev, max_retries=3)
+        jid = await mgr.enqueue_print_text("fis")
+        status = await mgr.wait_job(jid, 5)
+        await mgr.stop()
+        return dev, mgr, status
+
+    dev, mgr, status = asyncio.run(run())
+    assert status["state"] == "done"
+    assert status["attempts"] == 2
+    assert status["last_error"] is None
+    assert dev.printed == ["fis"]
+    assert mgr.dead_letters() == []
+
+def test_exhausted_retries_go_to_dead_letter(tmp_path):
+    async def run():
+        dev = FakeDevice(fail=100)
+        mgr = _manager(tmp_path, dev, max_retries=2)
+        jid = await mgr.enqueue_print_text("fis")
+        status = await mgr.wait_job(jid, 5)
+        await mgr.stop()
+        return jid, mgr, status
+
+    jid, mgr, status = asyncio.run(run())
+    assert status["state"] == "failed"
+    assert status["attempts"] == 3  # ilk deneme + 2 retry
+    (rec,) = mgr.dead_letters()
+    assert rec["id"] == jid and rec["kind"] == "text" and rec["attempts"] == 3
+    assert rec["payload"]["text"] == "fis"
+    assert "USB write timeout" in rec["error"]
+
+def test_non_retryable_error_is_dead_lettered_at_once(tmp_path):
+    async def run():
+        mgr = _manager(tmp_path, FakeDevice(), max_retries=5)
+        jid = await mgr.enqueue_print_image(str(tmp_path / "missing.png"), banded=True)
+        status = await mgr.wait_job(jid, 5)
+        await mgr.stop()
+        return mgr, status
+
+    mgr, status = asyncio.run(run())
+    assert status["state"] == "failed"
+    assert status["attempts"] == 1
+    assert status["last_error"].startswith("FileNotFoundError")
+    assert len(mgr.dead_letters()) == 1
+
+def test_backoff_grows_exponentially_and_is_capped(tmp_path):
+    async def run():
+        # worker'a hiç ulaşmayan, elle zamanlanan job: yalnızca heap'e bakılır
+        mgr = _manager(tmp_path, retry_initial=10.0, retry_max=50.0, max_retries=10)
+        job = PrintJob(id="j1", kind="text", payload={"text": "x"})
+        delays = []
+        for _ in range(5):
+            before = time.monotonic()
+            mgr._schedule_retry(job, OSError("busy"))
+            due, _, queued = mgr._retry_heap[-1]
+            assert queued is job
+            delays.append(due - before)
+        heap_size = len(mgr._retry_heap)
+        await mgr.stop()
+        return delays, heap_size
+
+    delays, heap_size = asyncio.run(run())
+    assert heap_size == 5
+    # wait_exponential_jitter: initial * 2^(n-1) + [0, 1) jitter, en fazla max
+    for n, (low, delay) in enumerate(zip([10, 20, 40, 50, 50], delays), start=1):
+        assert low <= delay <= min(low + 1, 50) + 0.1, (n, delay)
+
+def test_retry_heap_releases_jobs_in_due_order(tmp_path):
+    async def run():
+        dev = FakeDevice()
+        mgr = _manager(tmp_path, dev)
+        now = time.monotonic()
+        late = PrintJob(id="late", kind="text", payload={"text": "late"})
+        early = PrintJob(id="early", kind="text", payload={"text": "early"})
+        for job in (late, early):
+            job.mark("queued")
+            mgr._pending[job.id] = job
+        # heap sırası ekleme sırasından değil due zamanından gelir
+        mgr._retry_heap.extend([(now + 0.2, 1, late), (now + 0.05, 2, early)])
+        mgr._retry_heap.sort()
+        mgr._retry_wakeup.set()
+        await mgr.wait_job("late", 5)
+        await mgr.stop()
+        return dev
+
+    assert asyncio.run(run()).printed == ["early", "late"]
+
+def test_dead_letter_store_pop_selected_and_all(tmp_path):
+    store = DeadLetterStore(tmp_path / "dl.jsonl")
+    for i in range(3):
+        store.add(f"j{i}", "text", {"text": str(i)}, attempts=6, error="OSError: x")
+    assert [r["id"] for r in store.list(limit=2)] == ["j2", "j1"]  # en yeni önce
+    taken = store.pop(["j1", "unknown"])
+    assert [r["id"] for r in taken] == ["j1"]
+    assert sorted(r["id"] for r in store.list(limit=0)) == ["j0", "j2"]
+    assert store.pop(["unknown"]) == []
+    assert sorted(r["id"] for r in store.pop(None)) == ["j0", "j2"]
+    assert store.list() == []
+
+def test_requeue_dead_letters_prints_and_empties_queue(tmp_path):
+    async def run():
+        dev = FakeDevice(fail=100)
+        mgr = _manager(tmp_path, dev, max_retries=0)
+        ids = [await mgr.enqueue_print_text(t) for t in ("a", "b", "c")]
+        for jid in ids:
+            await mgr.wait_job(jid, 5)
+        assert len(mgr.dead_letters()) == 3
+        dev.fail = 0
+        mapping = await mgr.requeue_dead_letters([ids[0], ids[2]])
+        states = [(await mgr.wait_job(new, 5))["state"] for new in mapping.values()]
+        remaining = [r["id"] for r in mgr.dead_letters()]
+        await mgr.stop()
+        return ids, mapping, states, remaining, dev
+
+    ids, mapping, states, remaining, dev = asyncio.run(run())
+    assert set(mapping) == {ids[0], ids[2]}
+    assert not set(mapping.values()) & set(ids)  # yeni job id'leri
+    assert states == ["done", "done"]
+    assert sorted(dev.printed) == ["a", "c"]
+    assert remaining == [ids[1]]
+
+def _tall_png(path, height=2000):
+    Image.effect_noise((64, height), 64).convert("L").save(path)
+    return str(path)
+
+def test_tall_image_is_printed_in_bands_and_cut_once(tmp_path):
+    async def run():
+        dev = FakeDevice()
+        mgr = _manager(tmp_path, dev, band_height=256, band_threshold=1000)
+        jid = await mgr.enqueue_print_image(_tall_png(tmp_path / "tall.png"))
+        status = await mgr.wait_job(jid, 10)
+        await mgr.stop()
+        return dev, status
+
+    dev, status = asyncio.run(run())
+    assert status["state"] == "done"
+    assert dev.raw_writes == 8  # ceil(2000 / 256)
+    assert dev.cuts == 1
+
+def test_truncated_banded_image_is_cut_and_not_retried(tmp_path):
+    async def run():
+        full = tmp_path / "full.png"
+        _tall_png(full)
+        data = full.read_bytes()
+        cut = tmp_path / "cut.png"
+        cut.write_bytes(data[: len(data) // 2])
+        dev = FakeDevice()
+        mgr = _manager(tmp_path, dev, band_height=256, band_threshold=1000, max_retries=5)
+        jid = await mgr.enqueue_print_image(str(cut))
+        status = await mgr.wait_job(jid, 10)
+        await mgr.stop()
+        return dev, mgr, status
+
+    dev, mgr, status = asyncio.run(run())
+    assert status["state"] == "failed"
+    assert status["attempts"] == 1
+    assert status["last_error"].startswith("PartialPrintError")
+    assert 0 < dev.raw_writes < 8
+    assert dev.cuts == 1
+    assert len(mgr.dead_letters()) == 1